@@ -1,51 +1,72 @@
+import os
+
+# Matriks di sini sangat kecil (~200 x 3): overhead thread BLAS lebih besar
+# dari komputasinya, jadi batasi ke 1 thread (harus sebelum import numpy)
+for _var in ('OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'OMP_NUM_THREADS'):
+    os.environ.setdefault(_var, '1')
+
+import argparse
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-def analyze_recoil_data(filename):
-    """Load and preprocess recoil data from NPZ file."""
+def analyze_recoil_data(prefix):
+    """Load and preprocess recoil data from <prefix>_ys.npy (or a legacy .npz file)."""
     try:
-        data = np.load(filename, allow_pickle=True)
-        raw_ys = data['ys']    # Y (Recoil Control Vertikal)
-        raw_xs = data['xs']    # X axis
+        if prefix.endswith('.npz'):
+            # format lama: satu arsip NPZ berisi xs, ys, times
+            filename = prefix
+            raw_ys = np.load(filename)['ys']
+        else:
+            # .npy di-mmap: tidak ada decode arsip / copy buffer userspace,
+            # page cache OS dipakai ulang di run berikutnya
+            filename = f"{prefix}_ys.npy"
+            raw_ys = np.load(filename, mmap_mode='r')    # Y (Recoil Control Vertikal)
         
         print(f"Data berhasil dimuat dari {filename}. Jumlah percobaan: {len(raw_ys)}")
     except Exception as e:
-        print(f"Error memuat file {filename}: {e}")
-        return None, None
+        print(f"Error memuat data {prefix}: {e}")
+        return None, None, None
 
-    # Find minimum length for trimming
-    min_length = min([len(trial) for trial in raw_ys])
-    print(f"Trimming data ke panjang minimum: {min_length} sampel")
+    # Recorder selalu menyimpan array persegi (percobaan, sampel),
+    # jadi tidak perlu trimming
+    n_samples = raw_ys.shape[1]
+    print(f"Panjang data: {n_samples} sampel per percobaan")
 
-    processed_trials = []
-    
-    for i in range(len(raw_ys)):
-        y_trial = raw_ys[i]
-        y_trimmed = y_trial[:min_length]
-        y_relative = y_trimmed - y_trimmed[0]
-        processed_trials.append(y_relative)
+    # Jadikan relatif terhadap sampel pertama (broadcast, in-place).
+    # Data disimpan float32, dipromosikan ke float64 (copy) sebelum SVD
+    Y = raw_ys.astype(np.float64)
+    Y -= Y[:, :1]
 
     # Bikin Matriks A (Baris = Waktu, Kolom = Percobaan)
-    matrix_A = np.column_stack(processed_trials)
+    # Y row-major (satu baris per percobaan), jadi Y.T adalah view
+    # column-major tanpa copy tambahan: tiap kolom A contiguous
+    matrix_A = Y.T
     
     print(f"Matriks terbentuk. Dimensi: {matrix_A.shape}")
 
     # COMPUTING SVD
-    U, S, Vt = np.linalg.svd(matrix_A, full_matrices=False)
+    # Matriks A tinggi & kurus (sampel x percobaan), jadi nilai singular
+    # dihitung dari eigenvalue Gram matrix A^T A (percobaan x percobaan):
+    # sigma_i = sqrt(lambda_i)
+    G = matrix_A.T @ matrix_A
+    eig = np.linalg.eigvalsh(G)[::-1]    # urut menurun
+    S2 = np.maximum(eig, 0.0)            # sigma^2, dipakai lagi untuk energi
+    S = np.sqrt(S2)
     
     print("\nNilai Singular (Sigma):")
-    print(np.round(S, 4))
+    print(' '.join(f'{v:.4f}' for v in S))
     
     # Energi (Variansi yang dijelaskan)
-    energy = (S ** 2) / np.sum(S ** 2) * 100
+    energy = S2 * (100.0 / S2.sum())
     print("Kontribusi Energi per Rank (%):")
-    print(np.round(energy, 2))
+    print(' '.join(f'{v:.2f}' for v in energy))
     print(f"Energy concentration (E1): {energy[0]:.2f}%\n")
 
     return matrix_A, S, energy
 
-def compare_two_datasets(mouse_file, script_file):
-    """Compare mouse_trials and script_trials with side-by-side visualizations."""
+def compare_two_datasets(mouse_file, script_file, plot=True):
+    """Compare mouse_trials and script_trials, optionally with side-by-side visualizations."""
     
     print("="*60)
     print("MEMBANDINGKAN MOUSE TRIALS vs SCRIPT TRIALS")
@@ -64,115 +85,123 @@ def compare_two_datasets(mouse_file, script_file):
         print("Error: Gagal memuat salah satu atau kedua file.")
         return
     
+    if plot:
+        _plot_comparison(matrix_mouse, S_mouse, energy_mouse,
+                         matrix_script, S_script, energy_script)
+    
+    # Print Summary
+    print("\n" + "="*60)
+    print("RINGKASAN PERBANDINGAN")
+    print("="*60)
+    print(f"Mouse Trials   - E1: {energy_mouse[0]:.2f}% | Singular Values: {np.round(S_mouse, 2)}")
+    print(f"Script Trials  - E1: {energy_script[0]:.2f}% | Singular Values: {np.round(S_script, 2)}")
+    print(f"\nSelisih E1: {abs(energy_mouse[0] - energy_script[0]):.2f}%")
+    
+    if energy_script[0] > 90 and energy_mouse[0] < 85:
+        print("\n✓ KESIMPULAN: Script trials menunjukkan struktur LOW-RANK (synthetic)")
+        print("✓ Mouse trials menunjukkan struktur DISTRIBUTED (human)")
+    print("="*60 + "\n")
+
+    return {
+        'S_mouse': S_mouse,
+        'energy_mouse': energy_mouse,
+        'S_script': S_script,
+        'energy_script': energy_script,
+    }
+
+def _plot_comparison(matrix_mouse, S_mouse, energy_mouse,
+                     matrix_script, S_script, energy_script):
+    """Render trajectory, scree and energy distribution plots in one figure."""
+    
+    # Satu figure 3x2: baris = visualisasi, kolom = mouse / script
+    # (OO API + Agg, tanpa pyplot: tidak ada deteksi/inisialisasi backend GUI)
+    fig = Figure(figsize=(12, 15))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(3, 2)
+    
     # ==========================================
     # VISUALISASI 1: TRAJEKTORI PERBANDINGAN
     # ==========================================
     
-    fig1, ax1 = plt.subplots(1, 2, figsize=(12, 5))
-    
     # Mouse Trials Trajectory
-    ax1[0].plot(matrix_mouse, linewidth=1.5, alpha=0.7)
-    ax1[0].set_title(f"Mouse Trials: Trajektori Vertikal\n(E1: {energy_mouse[0]:.2f}%)", fontsize=11, fontweight='bold')
-    ax1[0].set_xlabel("Waktu (Sampel)")
-    ax1[0].set_ylabel("Pergeseran Pixel (Relatif)")
-    ax1[0].grid(True, alpha=0.3)
-    ax1[0].legend([f'Trial {i+1}' for i in range(matrix_mouse.shape[1])], fontsize=8)
+    axes[0, 0].plot(matrix_mouse, linewidth=1.5, alpha=0.7)
+    axes[0, 0].set_title(f"Mouse Trials: Trajektori Vertikal\n(E1: {energy_mouse[0]:.2f}%)", fontsize=11, fontweight='bold')
+    axes[0, 0].set_xlabel("Waktu (Sampel)")
+    axes[0, 0].set_ylabel("Pergeseran Pixel (Relatif)")
+    axes[0, 0].grid(True, alpha=0.3)
+    axes[0, 0].legend([f'Trial {i+1}' for i in range(matrix_mouse.shape[1])], fontsize=8)
     
     # Script Trials Trajectory
-    ax1[1].plot(matrix_script, linewidth=1.5, alpha=0.7)
-    ax1[1].set_title(f"Script Trials: Trajektori Vertikal\n(E1: {energy_script[0]:.2f}%)", fontsize=11, fontweight='bold')
-    ax1[1].set_xlabel("Waktu (Sampel)")
-    ax1[1].set_ylabel("Pergeseran Pixel (Relatif)")
-    ax1[1].grid(True, alpha=0.3)
-    ax1[1].legend([f'Trial {i+1}' for i in range(matrix_script.shape[1])], fontsize=8)
-    
-    plt.tight_layout()
-    plt.savefig('fig1_trajectories.png', dpi=150, bbox_inches='tight')
-    plt.show()
+    axes[0, 1].plot(matrix_script, linewidth=1.5, alpha=0.7)
+    axes[0, 1].set_title(f"Script Trials: Trajektori Vertikal\n(E1: {energy_script[0]:.2f}%)", fontsize=11, fontweight='bold')
+    axes[0, 1].set_xlabel("Waktu (Sampel)")
+    axes[0, 1].set_ylabel("Pergeseran Pixel (Relatif)")
+    axes[0, 1].grid(True, alpha=0.3)
+    axes[0, 1].legend([f'Trial {i+1}' for i in range(matrix_script.shape[1])], fontsize=8)
     
     # ==========================================
     # VISUALISASI 2: SCREE PLOT (SINGULAR VALUES)
     # ==========================================
     
-    fig2, ax2 = plt.subplots(1, 2, figsize=(12, 5))
-    
     # Mouse Trials Scree Plot
     ranks_mouse = np.arange(1, len(S_mouse) + 1)
-    bars_mouse = ax2[0].bar(ranks_mouse, S_mouse, color='steelblue', edgecolor='black', alpha=0.7)
-    ax2[0].set_title(f"Mouse Trials: Scree Plot\n(E1 = {energy_mouse[0]:.2f}%)", fontsize=11, fontweight='bold')
-    ax2[0].set_xlabel("Rank (k)")
-    ax2[0].set_ylabel("Nilai Singular")
-    ax2[0].set_xticks(ranks_mouse)
-    ax2[0].grid(True, axis='y', alpha=0.3)
-    
-    for bar, val, pct in zip(bars_mouse, S_mouse, energy_mouse):
-        height = bar.get_height()
-        ax2[0].text(bar.get_x() + bar.get_width()/2., height,
-                    f'{val:.1f}\n({pct:.1f}%)',
-                    ha='center', va='bottom', fontsize=8)
+    bars_mouse = axes[1, 0].bar(ranks_mouse, S_mouse, color='steelblue', edgecolor='black', alpha=0.7)
+    axes[1, 0].set_title(f"Mouse Trials: Scree Plot\n(E1 = {energy_mouse[0]:.2f}%)", fontsize=11, fontweight='bold')
+    axes[1, 0].set_xlabel("Rank (k)")
+    axes[1, 0].set_ylabel("Nilai Singular")
+    axes[1, 0].set_xticks(ranks_mouse)
+    axes[1, 0].grid(True, axis='y', alpha=0.3)
+    
+    labels_mouse = [f'{v:.1f}\n({p:.1f}%)' for v, p in zip(S_mouse, energy_mouse)]
+    axes[1, 0].bar_label(bars_mouse, labels=labels_mouse, fontsize=8, padding=2)
     
     # Script Trials Scree Plot
     ranks_script = np.arange(1, len(S_script) + 1)
-    bars_script = ax2[1].bar(ranks_script, S_script, color='coral', edgecolor='black', alpha=0.7)
-    ax2[1].set_title(f"Script Trials: Scree Plot\n(E1 = {energy_script[0]:.2f}%)", fontsize=11, fontweight='bold')
-    ax2[1].set_xlabel("Rank (k)")
-    ax2[1].set_ylabel("Nilai Singular")
-    ax2[1].set_xticks(ranks_script)
-    ax2[1].grid(True, axis='y', alpha=0.3)
-    
-    for bar, val, pct in zip(bars_script, S_script, energy_script):
-        height = bar.get_height()
-        ax2[1].text(bar.get_x() + bar.get_width()/2., height,
-                    f'{val:.1f}\n({pct:.1f}%)',
-                    ha='center', va='bottom', fontsize=8)
-    
-    plt.tight_layout()
-    plt.savefig('fig2_scree_plots.png', dpi=150, bbox_inches='tight')
-    plt.show()
+    bars_script = axes[1, 1].bar(ranks_script, S_script, color='coral', edgecolor='black', alpha=0.7)
+    axes[1, 1].set_title(f"Script Trials: Scree Plot\n(E1 = {energy_script[0]:.2f}%)", fontsize=11, fontweight='bold')
+    axes[1, 1].set_xlabel("Rank (k)")
+    axes[1, 1].set_ylabel("Nilai Singular")
+    axes[1, 1].set_xticks(ranks_script)
+    axes[1, 1].grid(True, axis='y', alpha=0.3)
+    
+    labels_script = [f'{v:.1f}\n({p:.1f}%)' for v, p in zip(S_script, energy_script)]
+    axes[1, 1].bar_label(bars_script, labels=labels_script, fontsize=8, padding=2)
     
     # ==========================================
     # VISUALISASI 3: ENERGY DISTRIBUTION
     # ==========================================
     
-    fig3, ax3 = plt.subplots(1, 2, figsize=(12, 5))
-    
     # Mouse Trials Energy
-    ax3[0].bar(ranks_mouse, energy_mouse, color='steelblue', edgecolor='black', alpha=0.7)
-    ax3[0].set_title("Mouse Trials: Distribusi Energi (%)", fontsize=11, fontweight='bold')
-    ax3[0].set_xlabel("Rank (k)")
-    ax3[0].set_ylabel("Energi (%)")
-    ax3[0].set_xticks(ranks_mouse)
-    ax3[0].grid(True, axis='y', alpha=0.3)
-    ax3[0].axhline(y=90, color='red', linestyle='--', linewidth=2, label='Threshold (90%)')
-    ax3[0].legend()
+    axes[2, 0].bar(ranks_mouse, energy_mouse, color='steelblue', edgecolor='black', alpha=0.7)
+    axes[2, 0].set_title("Mouse Trials: Distribusi Energi (%)", fontsize=11, fontweight='bold')
+    axes[2, 0].set_xlabel("Rank (k)")
+    axes[2, 0].set_ylabel("Energi (%)")
+    axes[2, 0].set_xticks(ranks_mouse)
+    axes[2, 0].grid(True, axis='y', alpha=0.3)
+    axes[2, 0].axhline(y=90, color='red', linestyle='--', linewidth=2, label='Threshold (90%)')
+    axes[2, 0].legend()
     
     # Script Trials Energy
-    ax3[1].bar(ranks_script, energy_script, color='coral', edgecolor='black', alpha=0.7)
-    ax3[1].set_title("Script Trials: Distribusi Energi (%)", fontsize=11, fontweight='bold')
-    ax3[1].set_xlabel("Rank (k)")
-    ax3[1].set_ylabel("Energi (%)")
-    ax3[1].set_xticks(ranks_script)
-    ax3[1].grid(True, axis='y', alpha=0.3)
-    ax3[1].axhline(y=90, color='red', linestyle='--', linewidth=2, label='Threshold (90%)')
-    ax3[1].legend()
-    
-    plt.tight_layout()
-    plt.savefig('fig3_energy_distribution.png', dpi=150, bbox_inches='tight')
-    plt.show()
-    
-    # Print Summary
-    print("\n" + "="*60)
-    print("RINGKASAN PERBANDINGAN")
-    print("="*60)
-    print(f"Mouse Trials   - E1: {energy_mouse[0]:.2f}% | Singular Values: {np.round(S_mouse, 2)}")
-    print(f"Script Trials  - E1: {energy_script[0]:.2f}% | Singular Values: {np.round(S_script, 2)}")
-    print(f"\nSelisih E1: {abs(energy_mouse[0] - energy_script[0]):.2f}%")
-    
-    if energy_script[0] > 90 and energy_mouse[0] < 85:
-        print("\n✓ KESIMPULAN: Script trials menunjukkan struktur LOW-RANK (synthetic)")
-        print("✓ Mouse trials menunjukkan struktur DISTRIBUTED (human)")
-    print("="*60 + "\n")
+    axes[2, 1].bar(ranks_script, energy_script, color='coral', edgecolor='black', alpha=0.7)
+    axes[2, 1].set_title("Script Trials: Distribusi Energi (%)", fontsize=11, fontweight='bold')
+    axes[2, 1].set_xlabel("Rank (k)")
+    axes[2, 1].set_ylabel("Energi (%)")
+    axes[2, 1].set_xticks(ranks_script)
+    axes[2, 1].grid(True, axis='y', alpha=0.3)
+    axes[2, 1].axhline(y=90, color='red', linestyle='--', linewidth=2, label='Threshold (90%)')
+    axes[2, 1].legend()
+    
+    fig.tight_layout()
+    fig.savefig('fig_combined.png', dpi=150, bbox_inches='tight',
+                metadata={'Software': ''}, pil_kwargs={'compress_level': 1})
+    print("Gambar disimpan ke: fig_combined.png")
 
 # JALANKAN FUNGSI
-# Bandingkan mouse_trials.npz dengan script_trials.npz
-compare_two_datasets('mouse_trials.npz', 'script_trials.npz')
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan mouse_trials dengan script_trials")
+    parser.add_argument('--no-plot', action='store_true',
+                        help="hanya analisis numerik, tanpa membuat gambar")
+    args = parser.parse_args()
+
+    # Bandingkan mouse_trials_*.npy dengan script_trials_*.npy
+    compare_two_datasets('mouse_trials', 'script_trials', plot=not args.no_plot)
@@ -4,11 +4,14 @@ mouse_recorder_matrix.py
 Rekam posisi mouse dari t=0 sampai t=2 detik, sebanyak N_TRIALS percobaan.
 Output:
  - CSV: each row = one trial, columns = trial_id, x0,y0,x1,y1,... (time is implicit: 0..duration)
- - NPZ: contains arrays xs (trials, samples), ys (trials, samples), times (samples,)
+ - NPY: <prefix>_xs.npy (trials, samples), <prefix>_ys.npy (trials, samples), <prefix>_times.npy (samples,)
 """
 
+import sys
 import time
-import csv
+import errno
+import ctypes
+import ctypes.util
 import numpy as np
 from pynput.mouse import Controller
 
@@ -19,7 +22,7 @@ DURATION = 1.0            # seconds: rekam dari 0 sampai 2 detik
 INTERVAL = 0.01           # sampling interval in seconds (0.01 ~ 100 Hz)
 N_TRIALS = 3             # jumlah percobaan
 CSV_PATH = "mouse_trials.csv"
-NPZ_PATH = "mouse_trials.npz"
+NPY_PREFIX = "mouse_trials"     # -> mouse_trials_xs.npy, _ys.npy, _times.npy
 # -------------------------
 
 # compute number of samples including t=0 and t=DURATION
@@ -30,10 +33,62 @@ print(f"Konfigurasi: duration={DURATION}s, interval={INTERVAL}s (~{1/INTERVAL:.0
 mouse = Controller()
 
 # prepare storage
-xs = np.zeros((N_TRIALS, n_samples), dtype=float)
-ys = np.zeros((N_TRIALS, n_samples), dtype=float)
+# float32 is plenty for integer pixel coordinates.
+# Layout SoA-by-trial: x dan y di array terpisah, row-major sehingga tiap
+# trial (xs[trial, :]) contiguous di memori -> downstream cukup ys.T (view)
+xs = np.zeros((N_TRIALS, n_samples), dtype=np.float32, order='C')
+ys = np.zeros((N_TRIALS, n_samples), dtype=np.float32, order='C')
 times = np.array([round(i * INTERVAL, 6) for i in range(n_samples)])  # 0, 0.01, 0.02, ..., 2.0
 
+# -------------------------
+# TIMER SETUP
+# -------------------------
+# Linux: perf_counter() == CLOCK_MONOTONIC, jadi bisa tidur sampai deadline
+# absolut dengan clock_nanosleep(TIMER_ABSTIME) tanpa busy-wait sama sekali.
+_CLOCK_MONOTONIC = 1
+_TIMER_ABSTIME = 1
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+_clock_nanosleep = None
+if (sys.platform.startswith("linux")
+        and time.get_clock_info("perf_counter").implementation == "clock_gettime(CLOCK_MONOTONIC)"):
+    try:
+        _clock_nanosleep = ctypes.CDLL(ctypes.util.find_library("c")).clock_nanosleep
+        _clock_nanosleep.argtypes = [ctypes.c_int, ctypes.c_int,
+                                     ctypes.POINTER(_Timespec), ctypes.POINTER(_Timespec)]
+    except (OSError, AttributeError):
+        _clock_nanosleep = None
+
+# Windows: timer resolution diminta 1 ms (timeBeginPeriod) saat merekam,
+# jadi guard busy-wait bisa jauh lebih pendek
+SPIN_GUARD = 0.0002 if sys.platform == "win32" else 0.001
+
+def wait_until(target):
+    """Tunggu sampai perf_counter() >= target."""
+    global _clock_nanosleep
+    if _clock_nanosleep is not None:
+        sec = int(target)
+        ts = _Timespec(sec, int((target - sec) * 1e9))
+        # clock_nanosleep mengembalikan kode error langsung (bukan via errno)
+        rc = _clock_nanosleep(_CLOCK_MONOTONIC, _TIMER_ABSTIME, ctypes.byref(ts), None)
+        # retry hanya kalau terbangun karena sinyal (EINTR)
+        while rc == errno.EINTR:
+            rc = _clock_nanosleep(_CLOCK_MONOTONIC, _TIMER_ABSTIME, ctypes.byref(ts), None)
+        if rc == 0:
+            return
+        # error lain (EINVAL, EPERM/ENOSYS di sandbox, ...): jangan spin
+        # selamanya, pakai sleep + busy-wait untuk sisa rekaman
+        _clock_nanosleep = None
+    # tunggu sampai target (sleep sebagian + busy-wait jika perlu)
+    to_sleep = target - time.perf_counter()
+    if to_sleep > 2 * SPIN_GUARD:
+        time.sleep(to_sleep - SPIN_GUARD)  # tidur sebagian
+    # busy wait short interval to improve timing
+    while time.perf_counter() < target:
+        pass
+
 def record_one_trial(trial_index):
     """
     Rekam satu trial. Menggunakan scheduling dengan target times
@@ -48,15 +103,7 @@ def record_one_trial(trial_index):
 
     start = time.perf_counter()
     for i in range(n_samples):
-        target = start + i * INTERVAL
-        # tunggu sampai target (sleep sebagian + busy-wait jika perlu)
-        now = time.perf_counter()
-        to_sleep = target - now
-        if to_sleep > 0.002:
-            time.sleep(to_sleep - 0.001)  # tidur sebagian
-        # busy wait short interval to improve timing
-        while time.perf_counter() < target:
-            pass
+        wait_until(start + i * INTERVAL)
         # read position (relative timestamp = actual - start)
         px, py = mouse.position
         xs[trial_index, i] = px
@@ -66,44 +113,46 @@ def record_one_trial(trial_index):
     print(f"Trial {trial_index+1} selesai. Durasi aktual: {actual_end:.4f}s (target {DURATION}s)")
 
 # run all trials
+if sys.platform == "win32":
+    ctypes.windll.winmm.timeBeginPeriod(1)
 try:
     for t in range(N_TRIALS):
         record_one_trial(t)
 except KeyboardInterrupt:
     print("\nDirem (KeyboardInterrupt). Data sampai trial terakhir yang lengkap akan disimpan.")
+finally:
+    if sys.platform == "win32":
+        ctypes.windll.winmm.timeEndPeriod(1)
 
 # Ensure we have valid numbers; if any trailing zeros because of interruption, you can handle separately.
 # Save CSV: header + each trial flattened as x0,y0,x1,y1,...
+# header: trial_id, then pairs t=0..t=end as "x_0.000","y_0.000",...
+header = ["trial_id"] + [f"{a}_{tt:.3f}" for tt in times for a in ("x", "y")]
+
+# rows: trial numbering 1-based, then interleaved x,y
+rows = np.empty((xs.shape[0], 1 + 2 * n_samples), dtype=float)
+rows[:, 0] = np.arange(1, xs.shape[0] + 1)
+rows[:, 1::2] = xs
+rows[:, 2::2] = ys
+
 with open(CSV_PATH, "w", newline="") as f:
-    writer = csv.writer(f)
-    # header: trial_id, then pairs t=0..t=end as "x_0.000","y_0.000",...
-    header = ["trial_id"]
-    for tt in times:
-        header.append(f"x_{tt:.3f}")
-        header.append(f"y_{tt:.3f}")
-    writer.writerow(header)
-
-    for trial_idx in range(xs.shape[0]):
-        row = [trial_idx + 1]  # trial numbering 1-based
-        # interleave x,y
-        for i in range(n_samples):
-            row.append(f"{xs[trial_idx, i]:.6f}")
-            row.append(f"{ys[trial_idx, i]:.6f}")
-        writer.writerow(row)
+    f.write(",".join(header) + "\n")
+    np.savetxt(f, rows, fmt=["%d"] + ["%.6f"] * (2 * n_samples), delimiter=",")
 
 print(f"CSV disimpan ke: {CSV_PATH}")
 
-# Save binary numpy archive for easy loading
-np.savez(NPZ_PATH, xs=xs, ys=ys, times=times)
-print(f"NPZ disimpan ke: {NPZ_PATH}")
+# Save plain .npy files (float32) so they can be memory-mapped on load
+np.save(f"{NPY_PREFIX}_xs.npy", xs)
+np.save(f"{NPY_PREFIX}_ys.npy", ys)
+np.save(f"{NPY_PREFIX}_times.npy", times.astype(np.float32))
+print(f"NPY disimpan ke: {NPY_PREFIX}_{{xs,ys,times}}.npy")
 
 # Example mapping functions (untuk analisis selanjutnya)
-def load_npz_to_matrices(path):
-    data = np.load(path)
-    xs = data["xs"]   # shape (trials, samples)
-    ys = data["ys"]   # shape (trials, samples)
+def load_npy_to_matrices(prefix):
+    xs = np.load(f"{prefix}_xs.npy", mmap_mode="r")   # shape (trials, samples)
+    ys = np.load(f"{prefix}_ys.npy", mmap_mode="r")   # shape (trials, samples)
     
-    times = data["times"]  # shape (samples,)
+    times = np.load(f"{prefix}_times.npy")  # shape (samples,)
     # Option A: interleaved flattened matrix where each row = trial
     # shape => (trials, samples*2)
     interleaved = np.empty((xs.shape[0], xs.shape[1] * 2), dtype=float)
@@ -115,7 +164,7 @@ def load_npz_to_matrices(path):
     return xs, ys, times, interleaved, mat3d
 
 # quick demo how to load
-# xs_loaded, ys_loaded, times_loaded, interleaved_matrix, mat3d = load_npz_to_matrices(NPZ_PATH)
+# xs_loaded, ys_loaded, times_loaded, interleaved_matrix, mat3d = load_npy_to_matrices(NPY_PREFIX)
 # print("interleaved_matrix shape:", interleaved_matrix.shape)
 # print("mat3d shape:", mat3d.shape)
 
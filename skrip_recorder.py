@@ -1,7 +1,7 @@
 """
 lua_assumed_to_csv.py
 
-Generate CSV + NPZ with assumed mouse motion from a Logitech-style macro:
+Generate CSV + NPY with assumed mouse motion from a Logitech-style macro:
  - assumption: MoveMouseRelative(0, +5) called every 6 ms, continuously for the trial
  - sampling: sample every INTERVAL seconds (default 0.01 s)
  - duration: default 2.0 s (0..2s)
@@ -9,11 +9,10 @@ Generate CSV + NPZ with assumed mouse motion from a Logitech-style macro:
 
 Output:
  - CSV: mouse_trials.csv (each row = one trial, columns trial_id, x_0.000,y_0.000,...)
- - NPZ: mouse_trials.npz (xs, ys, times)
+ - NPY: script_trials_xs.npy, script_trials_ys.npy, script_trials_times.npy
 """
 
 import numpy as np
-import csv
 
 # -------------------------
 # CONFIG (ubah jika perlu)
@@ -21,8 +20,11 @@ import csv
 DURATION = 2.0         # seconds, record from t=0 to t=2.0
 INTERVAL = 0.01        # sampling interval in seconds (100 Hz)
 N_TRIALS = 3           # number of trials
+# use the parallel Numba kernel (if installed) only from this many trials up;
+# below it the numba import + JIT cost outweighs the NumPy broadcast
+NUMBA_MIN_TRIALS = 1000
 CSV_PATH = "script_trials.csv"
-NPZ_PATH = "script_trials.npz"
+NPY_PREFIX = "script_trials"   # -> script_trials_xs.npy, _ys.npy, _times.npy
 # Assumed macro parameters (from your lua): every 6 ms move (0, +5)
 MOVE_DX = 0
 MOVE_DY = 5
@@ -39,84 +41,107 @@ def build_assumed_trace(duration, interval, move_dx, move_dy, move_ms, initial_p
     """
     n_samples = int(round(duration / interval)) + 1
     times = np.array([round(i * interval, 6) for i in range(n_samples)])
-    xs = np.zeros(n_samples, dtype=float)
-    ys = np.zeros(n_samples, dtype=float)
 
     # convert move interval to seconds
     move_dt = move_ms / 1000.0
-    # next move time scheduled, starting at t=0
-    next_move_time = 0.0
-
-    x = float(initial_pos[0])
-    y = float(initial_pos[1])
-
-    for i, t in enumerate(times):
-        # apply all moves whose scheduled time <= current sample time
-        # (handles cases where multiple moves happen between two sample points)
-        # careful with infinite loops if move_dt == 0 (shouldn't happen here)
-        if move_dt > 0:
-            # number of moves that have occurred up to time t (inclusive)
-            # floor((t + epsilon) / move_dt) - floor((prev_t + epsilon) / move_dt)
-            # but simpler: loop while next_move_time <= t
-            safety = 0
-            while next_move_time <= t + 1e-12:
-                x += move_dx
-                y += move_dy
-                next_move_time += move_dt
-                safety += 1
-                # safety guard (should not trigger)
-                if safety > 1000000:
-                    raise RuntimeError("Too many iterations in move loop (safety stop).")
-        else:
-            # if move_dt <= 0, no periodic moves; do nothing
-            pass
-
-        xs[i] = x
-        ys[i] = y
+
+    if move_dt > 0:
+        # the macro is purely periodic (moves at t = 0, move_dt, 2*move_dt, ...),
+        # so the number of moves applied up to sample time t (inclusive) is
+        # floor(t / move_dt) + 1 -> closed-form ramp, no per-sample loop
+        n_moves = np.floor(times / move_dt + 1e-12).astype(np.int64) + 1
+    else:
+        # if move_dt <= 0, no periodic moves
+        n_moves = np.zeros(n_samples, dtype=np.int64)
+
+    xs = float(initial_pos[0]) + n_moves * move_dx
+    ys = float(initial_pos[1]) + n_moves * move_dy
 
     return xs, ys, times
 
-def write_outputs(xs_all, ys_all, times, csv_path, npz_path):
+_gen_all_kernel = None
+
+def _load_kernel():
+    """Import numba and compile the parallel trial kernel (None if numba is missing)."""
+    global _gen_all_kernel
+    if _gen_all_kernel is None:
+        try:
+            from numba import njit, prange
+        except ImportError:  # numba is optional, fall back to pure NumPy
+            return None
+
+        @njit(parallel=True, cache=True)
+        def kernel(times, move_dt, move_dx, move_dy, x0, y0, xs_all, ys_all):
+            n_trials, n_samples = xs_all.shape
+            for t in prange(n_trials):
+                for i in range(n_samples):
+                    n_moves = 0
+                    if move_dt > 0:
+                        n_moves = int(np.floor(times[i] / move_dt + 1e-12)) + 1
+                    xs_all[t, i] = x0 + n_moves * move_dx
+                    ys_all[t, i] = y0 + n_moves * move_dy
+
+        _gen_all_kernel = kernel
+    return _gen_all_kernel
+
+def gen_all(xs_all, ys_all, duration, interval, move_dx, move_dy, move_ms, initial_pos):
+    """
+    Fill xs_all, ys_all (trials, samples) in place with the assumed trace
+    for every trial and return the sample times. From NUMBA_MIN_TRIALS trials
+    up this uses a parallel Numba kernel (one trial per thread) when numba is
+    installed; otherwise the trace is built once with build_assumed_trace and
+    broadcast across trials.
+    """
+    kernel = _load_kernel() if xs_all.shape[0] >= NUMBA_MIN_TRIALS else None
+    if kernel is None:
+        xs, ys, times = build_assumed_trace(duration, interval, move_dx, move_dy, move_ms, initial_pos)
+        xs_all[:] = xs
+        ys_all[:] = ys
+        return times
+
+    n_samples = xs_all.shape[1]
+    times = np.array([round(i * interval, 6) for i in range(n_samples)])
+    kernel(times, move_ms / 1000.0, float(move_dx), float(move_dy),
+           float(initial_pos[0]), float(initial_pos[1]), xs_all, ys_all)
+    return times
+
+def write_outputs(xs_all, ys_all, times, csv_path, npy_prefix):
     n_trials, n_samples = xs_all.shape
     # CSV header
-    header = ["trial_id"]
-    for tt in times:
-        header.append(f"x_{tt:.3f}")
-        header.append(f"y_{tt:.3f}")
+    header = ["trial_id"] + [f"{a}_{tt:.3f}" for tt in times for a in ("x", "y")]
+
+    # rows: 1-based trial id, then interleaved x,y per sample
+    rows = np.empty((n_trials, 1 + 2 * n_samples), dtype=float)
+    rows[:, 0] = np.arange(1, n_trials + 1)
+    rows[:, 1::2] = xs_all
+    rows[:, 2::2] = ys_all
 
     with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(header)
-        for tr in range(n_trials):
-            row = [tr + 1]  # 1-based trial id
-            for i in range(n_samples):
-                row.append(f"{xs_all[tr, i]:.6f}")
-                row.append(f"{ys_all[tr, i]:.6f}")
-            writer.writerow(row)
-
-    # save NPZ
-    np.savez(npz_path, xs=xs_all, ys=ys_all, times=times)
+        f.write(",".join(header) + "\n")
+        np.savetxt(f, rows, fmt=["%d"] + ["%.6f"] * (2 * n_samples), delimiter=",")
+
+    # save plain .npy files (float32) so the analysis can memory-map them
+    np.save(f"{npy_prefix}_xs.npy", xs_all)
+    np.save(f"{npy_prefix}_ys.npy", ys_all)
+    np.save(f"{npy_prefix}_times.npy", times.astype(np.float32))
     print(f"Saved CSV -> {csv_path}")
-    print(f"Saved NPZ -> {npz_path}")
+    print(f"Saved NPY -> {npy_prefix}_{{xs,ys,times}}.npy")
 
 def main():
     n_samples = int(round(DURATION / INTERVAL)) + 1
-    xs_all = np.zeros((N_TRIALS, n_samples), dtype=float)
-    ys_all = np.zeros((N_TRIALS, n_samples), dtype=float)
-    times = np.array([round(i * INTERVAL, 6) for i in range(n_samples)])
+    # SoA-by-trial, row-major: each trial xs_all[t, :] is contiguous
+    xs_all = np.zeros((N_TRIALS, n_samples), dtype=np.float32, order='C')
+    ys_all = np.zeros((N_TRIALS, n_samples), dtype=np.float32, order='C')
 
     print("Generating assumed traces with parameters:")
     print(f" DURATION={DURATION}s, INTERVAL={INTERVAL}s, samples={n_samples}")
     print(f" MOVE: dx={MOVE_DX}, dy={MOVE_DY} every {MOVE_MS} ms")
     print(f" N_TRIALS={N_TRIALS}, INITIAL_POS={INITIAL_POS}")
 
-    for t in range(N_TRIALS):
-        xs, ys, _ = build_assumed_trace(DURATION, INTERVAL, MOVE_DX, MOVE_DY, MOVE_MS, INITIAL_POS)
-        xs_all[t, :] = xs
-        ys_all[t, :] = ys
-        print(f" - trial {t+1} done")
+    times = gen_all(xs_all, ys_all, DURATION, INTERVAL, MOVE_DX, MOVE_DY, MOVE_MS, INITIAL_POS)
+    print(f" - {N_TRIALS} trials done")
 
-    write_outputs(xs_all, ys_all, times, CSV_PATH, NPZ_PATH)
+    write_outputs(xs_all, ys_all, times, CSV_PATH, NPY_PREFIX)
     print("All done.")
 
 if __name__ == "__main__":